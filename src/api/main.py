@@ -1,102 +1,50 @@
-import os
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
-from azure.identity.aio import DefaultAzureCredential
-
-from semantic_kernel.agents import AgentGroupChat, AzureAIAgent, AzureAIAgentSettings, AzureAssistantAgent
-from semantic_kernel.agents.strategies import TerminationStrategy
-from semantic_kernel.contents import AuthorRole
-
 from fastapi import FastAPI, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List
-import uvicorn
 
 # Load environment variables from the .env file
 load_dotenv()
 
-app = FastAPI()
+# The agent code (agent_chat, with semantic_kernel and azure.identity) is imported in a
+# worker thread once the server is up, which keeps container cold starts short.
+_agent_chat_import = None
+
+def load_agent_chat():
+    """Return a future for the agent_chat module, starting its import on the first call."""
+    global _agent_chat_import
+    if _agent_chat_import is None:
+        _agent_chat_import = asyncio.get_running_loop().run_in_executor(None, importlib.import_module, "agent_chat")
+    return _agent_chat_import
 
-class ApprovalTerminationStrategy(TerminationStrategy):
-    """A strategy for determining when an agent should terminate."""
+@asynccontextmanager
+async def lifespan(app):
+    # Warm up in the background; requests that arrive first wait for the same import
+    load_agent_chat()
+    yield
 
-    async def should_agent_terminate(self, agents, history):
-        """Check if the agent should terminate."""
-        return "approved" in history[-1].content.lower()
+app = FastAPI(lifespan=lifespan)
 
 class ChatRequest(BaseModel):
     messages: List[str]
 
-async def process_chat(messages):
-    # Fetch the model deployment name from the environment
-    model_deployment_name = os.getenv("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME")
-    if not model_deployment_name:
-        raise ValueError("AZURE_AI_AGENT_MODEL_DEPLOYMENT_NAME is not set in the environment.")
-
-    ai_agent_settings = AzureAIAgentSettings.create(
-        model_deployment_name=model_deployment_name
-    )
-
-    async with (
-        DefaultAzureCredential() as creds,
-        AzureAIAgent.create_client(credential=creds) as client,
-    ):
-        
-        #Get assistant agent
-        assistant_agent_definition = await client.agents.get_agent(os.getenv("AZURE_AI_SCI_ASSISTANT"))
-        agent_assistant = AzureAIAgent(
-            client=client,
-            definition=assistant_agent_definition,
-        )
-
-        #Get energy agent
-        energy_agent_definition = await client.agents.get_agent(os.getenv("AZURE_AI_ENERGY"))
-        agent_energy = AzureAIAgent(
-            client=client,
-            definition=energy_agent_definition,
-        )
-
-        #Get embodied agent
-        embedded_agent_definition = await client.agents.get_agent(os.getenv("AZURE_AI_EMBODIED"))
-        agent_embodied = AzureAIAgent(
-            client=client,           
-            definition=embedded_agent_definition
-        )
-
-        chat = AgentGroupChat(
-            agents=[agent_assistant, agent_energy, agent_embodied],
-            termination_strategy=ApprovalTerminationStrategy(agents=(agent_assistant, agent_energy, agent_embodied), maximum_iterations=1),
-        )
-
-        try:
-            for user_input in messages:
-                await chat.add_chat_message(message=user_input)                
-                
-                last_agent = None
-                async for response in chat.invoke():
-                    if response.content is not None:
-                        if last_agent != response.name:
-                            agent_intro = f"\n\n**{response.name}**: "
-                            yield agent_intro
-                            last_agent = response.name
-                        
-                        yield response.content
-                        
-        finally:
-            await chat.reset()
-            print("Chat completed")
-            
-
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
     async def generate():
-        async for chunk in process_chat(request.messages):
+        agent_chat = await load_agent_chat()
+        async for chunk in agent_chat.process_chat(request.messages):
             yield chunk
     
     return StreamingResponse(generate(), media_type="text/plain")
 
 if __name__ == "__main__":
+    import uvicorn
+
     # Run as script with test inputs
     # asyncio.run(main())
     
@@ -0,0 +1,121 @@
+import pytest
+
+import workload_parser
+from sci import calculate_SCI
+from workload_parser import parse_workload, precompute_sci_context, score_workload
+
+# The example SCI task from USER_INPUTS in src/app/chat_app.py, joined the same way
+USER_INPUTS = (
+    "calculate the Software Carbon Intensity (SCI) of this software solution."
+    "1. Neo4j API: Azure App Service, Memory Allocation: 1.75G, Memory Utilization: 70%, CPU Allocated: 1 vCPU, CPU Utilization: 25%, Compute: APIs are S1:1 app services"
+    "2. Graph DB: Neo4J:Memory Allocation 32G, Memory Utilization: 6.3G, CPU Allocated: 8 vCPU, CPU Utilization: 28%, Compute: D8ds VMs (8 vcpus, 32 GiB memory)"
+    "3. TigerGraph API: Azure App Service, Memory Allocation: 1.75G, Memory Utilization: 70%, CPU Allocated: 1 vCPU, CPU Utilization: 25%, Compute: APIs are S1:1 app services"
+    "4. Graph DB TigerGraph: Memory Allocation: 32G, Memory Utilization: 6%, CPU Allocated: 8 vCPU, CPU Utilization: 17%, Compute: D8ds VMs (8 vcpus, 32 GiB memory)"
+    "Country workload resides: USA "
+    "Assume R is per hour. "
+)
+
+
+def test_parse_workload_user_inputs():
+    workload = parse_workload(USER_INPUTS)
+
+    assert [c.name for c in workload.components] == ["Neo4j API", "Graph DB", "TigerGraph API", "Graph DB TigerGraph"]
+    assert [c.sku for c in workload.components] == ["S1", "D8DS", "S1", "D8DS"]
+    assert [c.memory_allocated_gb for c in workload.components] == [1.75, 32, 1.75, 32]
+    assert [c.vcpus for c in workload.components] == [1, 8, 1, 8]
+    assert [c.cpu_utilization for c in workload.components] == [25, 28, 25, 17]
+    assert workload.components[0].memory_utilization == 70
+    # "6.3G" of a 32G allocation
+    assert workload.components[1].memory_utilization == pytest.approx(6.3 / 32 * 100)
+    assert workload.components[3].memory_utilization == 6
+    assert (workload.components[0].platform_vcpus, workload.components[0].platform_memory_gb) == (1, 1.75)
+    assert (workload.components[1].platform_vcpus, workload.components[1].platform_memory_gb) == (8, 32)
+    assert workload.country == "USA"
+    assert workload.grid_intensity_source.startswith("default")
+
+
+def test_score_workload_user_inputs():
+    workload = score_workload(parse_workload(USER_INPUTS))
+
+    neo4j_api = workload.components[0]
+    # 70% memory -> 0.858, 25% CPU -> 0.4275
+    assert neo4j_api.energy_kwh == pytest.approx(0.38 * 0.858 + 270 * 0.4275)
+    assert neo4j_api.operational == pytest.approx(neo4j_api.energy_kwh * workload.grid_intensity)
+    # No embodied coefficients ship by default, so SCI is left to the agents
+    assert all(c.sci is None for c in workload.components)
+
+
+def test_score_workload_calls_calculate_sci_with_embodied_coefficient(monkeypatch):
+    monkeypatch.setitem(workload_parser.EMBODIED_COEFFICIENTS, "D8DS", 1_200_000)
+    workload = score_workload(parse_workload(USER_INPUTS))
+
+    graph_db = workload.components[1]
+    assert graph_db.sci == pytest.approx(calculate_SCI(
+        memory_utilization=6.3 / 32 * 100,
+        cpu_utilization=28,
+        grid_intensity=workload.grid_intensity,
+        embodied_coef=1_200_000,
+        instance_memory=32,
+        platform_memory=32,
+        instance_cpu=8,
+        platform_cpu=8,
+    ))
+    assert workload.components[0].sci is None
+
+
+def test_parse_workload_single_unnumbered_component():
+    workload = parse_workload(
+        "Please score this. Web API: Azure App Service, Memory Allocation: 2GiB, Memory Utilization: 512M, "
+        "CPU Allocated: 2 vCPU, CPU Utilization: 40%, Compute: P1v3. Grid intensity: 400 gCO2eq/kWh"
+    )
+
+    (component,) = workload.components
+    assert component.name == "Web API"
+    assert component.sku == "P1V3"
+    assert component.memory_utilization == 25
+    assert workload.grid_intensity == 400
+    assert workload.grid_intensity_source == "stated in the request"
+
+
+def test_parse_workload_step_is_not_a_component_name():
+    workload = parse_workload(
+        "Step 1. Use memory allocation: 4G, Memory Utilization: 50%, CPU Allocated: 2 vCPU, CPU Utilization: 30%"
+    )
+    (component,) = workload.components
+    assert component.name == "Component"
+    assert component.memory_allocated_gb == 4
+
+
+def test_parse_workload_numbered_list_on_lines():
+    workload = parse_workload(
+        "Score these, using Step 2. of the guide:\n"
+        "1. Frontend: Memory Allocation: 2G, Memory Utilization: 50%, CPU Allocated: 1 vCPU, CPU Utilization: 20%\n"
+        "2. Backend: Memory Allocation: 4G, Memory Utilization: 25%, CPU Allocated: 2 vCPU, CPU Utilization: 40%\n"
+    )
+    assert [c.name for c in workload.components] == ["Frontend", "Backend"]
+
+
+@pytest.mark.parametrize("text", [
+    "The country is the United States: yes. ",
+    "It runs in the same country as our users. ",
+])
+def test_country_label_stays_in_its_clause(text):
+    workload = parse_workload(
+        text + "Web API: Azure App Service, Memory Allocation: 2G, Memory Utilization: 50%, "
+        "CPU Allocated: 1 vCPU, CPU Utilization: 20%"
+    )
+    assert workload.components[0].name == "Web API"
+    assert workload.country is None and workload.grid_intensity is None
+
+
+def test_unknown_country_has_no_grid_intensity():
+    workload = score_workload(parse_workload(USER_INPUTS.replace("USA", "Narnia")))
+    assert workload.grid_intensity is None
+    assert all(c.operational is None and c.energy_kwh is not None for c in workload.components)
+
+
+def test_precompute_sci_context():
+    context = precompute_sci_context(USER_INPUTS)
+    assert "| Graph DB | D8DS | 32 | 19.7 | 8 | 28 | 8 / 32 |" in context
+    assert "I is a default" in context
+    assert precompute_sci_context("What is SCI?") is None
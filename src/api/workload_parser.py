@@ -0,0 +1,292 @@
+# Deterministic parser for workload descriptions such as the example SCI task in chat_app.py.
+# It runs before the agents are invoked: recognized components are normalized and scored
+# with sci.py in one pass, and the resulting table is handed to the agents as context so
+# they explain the numbers instead of extracting them from free text.
+#----------------------------------------------------------------------------------------------------
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sci import calculate_SCI, calculate_total_E, get_energy_coefficient
+
+# Default grid carbon intensity in gCO2eq/kWh, keyed by country alias: annual averages
+# from Ember's 2023 electricity data. Used only when the request does not state I, and
+# passed to the agents as a default they may replace with their own data source.
+GRID_INTENSITY_SOURCE = "Ember 2023 annual average"
+GRID_INTENSITY = {
+    "united states": 369,
+    "usa": 369,
+    "us": 369,
+    "united kingdom": 238,
+    "uk": 238,
+    "germany": 381,
+    "france": 56,
+    "sweden": 41,
+    "india": 713,
+}
+
+# vCPUs and memory (GB) of common App Service plans and VM sizes, used as the platform
+# when the description does not state them.
+SKU_SPECS = {
+    "B1": (1, 1.75),
+    "S1": (1, 1.75),
+    "S2": (2, 3.5),
+    "S3": (4, 7),
+    "P1V3": (2, 8),
+    "P2V3": (4, 16),
+    "P3V3": (8, 32),
+    "D2DS": (2, 8),
+    "D4DS": (4, 16),
+    "D8DS": (8, 32),
+    "D16DS": (16, 64),
+}
+
+# Total embodied emissions coefficient per SKU (gCO2eq). Populate from the coefficient data
+# in the AI Search index; components on SKUs without an entry get their operational
+# emissions (E * I) only and the agents supply M.
+EMBODIED_COEFFICIENTS = {}
+
+# Multipliers to GB. G and GiB are treated alike, as sizes are quoted both ways for the same SKU.
+_MEMORY_UNITS = {"K": 1 / 1024 ** 2, "M": 1 / 1024, "G": 1, "T": 1024}
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_MEMORY = _NUMBER + r"\s*([KMGT])(?:i?B)?\b"
+_COMPONENT_START = re.compile(r"(?<!\d)(\d{1,2})\.\s+(?=[A-Za-z])")
+_MEMORY_ALLOCATION = re.compile(r"memory\s+allocat\w*\s*:?\s*" + _MEMORY, re.IGNORECASE)
+_MEMORY_UTILIZATION = re.compile(r"memory\s+utili[sz]\w*\s*:?\s*" + _NUMBER + r"\s*(%|[KMGT](?:i?B)?\b)", re.IGNORECASE)
+_CPU_ALLOCATION = re.compile(r"cpus?\s+allocat\w*\s*:?\s*" + _NUMBER + r"\s*v?cpu", re.IGNORECASE)
+_CPU_UTILIZATION = re.compile(r"cpu\s+utili[sz]\w*\s*:?\s*" + _NUMBER + r"\s*%", re.IGNORECASE)
+_COMPUTE = re.compile(r"compute\s*:\s*(.*)", re.IGNORECASE | re.DOTALL)
+_SKU = re.compile(r"\b(?:Standard_)?([A-Z]{1,2}\d+[a-z]*(?:[_ ]?v\d)?)\b")
+_PLATFORM = re.compile(r"\(\s*" + _NUMBER + r"\s*vcpus?\s*,\s*" + _MEMORY, re.IGNORECASE)
+_COUNTRY = re.compile(r"country[^:.\n]*:\s*([A-Za-z][A-Za-z .]*)", re.IGNORECASE)
+_GRID_INTENSITY = re.compile(r"(?:grid\s+(?:carbon\s+)?intensity|\bI\b)\s*(?:=|:|is)?\s*" + _NUMBER + r"\s*g\s*CO2", re.IGNORECASE)
+_FIELD_LABELS = (_MEMORY_ALLOCATION, _MEMORY_UTILIZATION, _CPU_ALLOCATION, _CPU_UTILIZATION, _COMPUTE)
+
+
+@dataclass
+class WorkloadComponent:
+    """One component of a workload with its inputs normalized to GB, vCPUs and percent."""
+
+    name: str
+    memory_allocated_gb: float
+    memory_utilization: float
+    vcpus: float
+    cpu_utilization: float
+    sku: Optional[str] = None
+    platform_vcpus: Optional[float] = None
+    platform_memory_gb: Optional[float] = None
+    energy_kwh: Optional[float] = None
+    operational: Optional[float] = None
+    sci: Optional[float] = None
+    notes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Workload:
+    """Components parsed from a request and the grid intensity of the country they run in."""
+
+    components: List[WorkloadComponent]
+    country: Optional[str] = None
+    grid_intensity: Optional[float] = None
+    grid_intensity_source: Optional[str] = None
+
+
+def _lookup_sku(table, sku):
+    # Sizes are listed without a version suffix, e.g. D8ds_v5 uses the D8ds entry
+    if sku is None:
+        return None
+    return table.get(sku, table.get(re.sub(r"V\d+$", "", sku)))
+
+
+def _to_gb(value, unit):
+    return float(value) * _MEMORY_UNITS[unit[0].upper()]
+
+
+def _parse_grid_intensity(text):
+    match = _GRID_INTENSITY.search(text)
+    return float(match.group(1)) if match else None
+
+
+def _component_starts(text):
+    # A list number starts a component at the start of a line or after a sentence break,
+    # or anywhere when it continues the list, as in items joined without separators.
+    # "Step 1. Use ..." is not a list.
+    starts = []
+    previous = None
+    for match in _COMPONENT_START.finditer(text):
+        number = int(match.group(1))
+        before = text[:match.start()].rstrip(" \t")
+        if not before or before[-1] in "\n.!?:;" or (previous is not None and number == previous + 1):
+            starts.append(match.end())
+            previous = number
+    return starts
+
+
+def _parse_name(prefix):
+    # The name is the text before the first field label, without any preceding sentence,
+    # up to a colon or comma, e.g. "Neo4j API: Azure App Service, ". Text that runs into
+    # the label, as in "Use memory allocation: 4G", is not a name.
+    line = prefix.strip().splitlines()[-1] if prefix.strip() else ""
+    sentence = re.split(r"[.!?]\s+", line)[-1]
+    name = re.match(r"([^:,]*)[:,]", sentence)
+    return name.group(1).strip(" ;-*") if name else ""
+
+
+def _parse_country(text):
+    # Only a known alias counts, so a value such as "yes" is not taken for a country
+    for match in _COUNTRY.finditer(text):
+        words = match.group(1).lower().replace(".", "").split()
+        # Prefer the longest known alias at the start of the value, e.g. "united states"
+        for length in range(min(len(words), 3), 0, -1):
+            alias = " ".join(words[:length])
+            if alias in GRID_INTENSITY:
+                return alias.upper() if len(alias) <= 3 else alias.title(), GRID_INTENSITY[alias]
+    return None, None
+
+
+def _parse_component(segment):
+    memory_allocation = _MEMORY_ALLOCATION.search(segment)
+    memory_utilization = _MEMORY_UTILIZATION.search(segment)
+    cpu_allocation = _CPU_ALLOCATION.search(segment)
+    cpu_utilization = _CPU_UTILIZATION.search(segment)
+    if not (memory_allocation and memory_utilization and cpu_allocation and cpu_utilization):
+        return None
+
+    first_label = min(match.start() for match in (label.search(segment) for label in _FIELD_LABELS) if match)
+    memory_allocated_gb = _to_gb(*memory_allocation.groups())
+    if not memory_allocated_gb:
+        return None
+    notes = []
+
+    value, unit = memory_utilization.groups()
+    if unit == "%":
+        memory_percent = float(value)
+    else:
+        # Absolute utilization such as "6.3G" is expressed as a share of the allocation
+        used_gb = _to_gb(value, unit)
+        memory_percent = used_gb / memory_allocated_gb * 100
+        notes.append(f"memory utilization {value}{unit} of {memory_allocated_gb:g} GB = {memory_percent:.1f}%")
+
+    component = WorkloadComponent(
+        name=_parse_name(segment[:first_label]) or "Component",
+        memory_allocated_gb=memory_allocated_gb,
+        memory_utilization=memory_percent,
+        vcpus=float(cpu_allocation.group(1)),
+        cpu_utilization=float(cpu_utilization.group(1)),
+        notes=notes,
+    )
+
+    compute = _COMPUTE.search(segment)
+    if compute:
+        sku = _SKU.search(compute.group(1))
+        if sku:
+            component.sku = re.sub(r"[_ ]", "", sku.group(1)).upper()
+        platform = _PLATFORM.search(compute.group(1))
+        if platform:
+            component.platform_vcpus = float(platform.group(1))
+            component.platform_memory_gb = _to_gb(platform.group(2), platform.group(3))
+    if component.platform_vcpus is None and _lookup_sku(SKU_SPECS, component.sku):
+        component.platform_vcpus, component.platform_memory_gb = _lookup_sku(SKU_SPECS, component.sku)
+    return component
+
+
+def parse_workload(text):
+    """Parse the component descriptions in text.
+
+    Components are read from a numbered list; without one, the whole text is read as a
+    single component. Returns a Workload, or None when no complete description is found.
+    """
+    starts = _component_starts(text)
+    segments = [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+    components = [component for component in map(_parse_component, segments) if component]
+    if not components:
+        component = _parse_component(text)
+        components = [component] if component else []
+    if not components:
+        return None
+
+    workload = Workload(components=components)
+    workload.country, default_intensity = _parse_country(text)
+    workload.grid_intensity = _parse_grid_intensity(text)
+    if workload.grid_intensity is not None:
+        workload.grid_intensity_source = "stated in the request"
+    elif default_intensity is not None:
+        workload.grid_intensity = default_intensity
+        workload.grid_intensity_source = f"default, {GRID_INTENSITY_SOURCE}"
+    return workload
+
+
+def score_workload(workload):
+    """Score every component of the workload with sci.py, filling in the results in place."""
+    for component in workload.components:
+        if not (0 <= component.memory_utilization <= 100 and 0 <= component.cpu_utilization <= 100):
+            component.notes.append("utilization outside 0-100%, not scored")
+            continue
+
+        component.energy_kwh = calculate_total_E(
+            get_energy_coefficient(component.memory_utilization),
+            get_energy_coefficient(component.cpu_utilization),
+        )
+        if workload.grid_intensity is None:
+            component.notes.append("grid intensity unknown for the country")
+            continue
+        component.operational = component.energy_kwh * workload.grid_intensity
+
+        embodied_coef = _lookup_sku(EMBODIED_COEFFICIENTS, component.sku)
+        if embodied_coef is None or component.platform_vcpus is None:
+            component.notes.append("embodied emissions (M) not available for this SKU")
+            continue
+        component.sci = calculate_SCI(
+            memory_utilization=component.memory_utilization,
+            cpu_utilization=component.cpu_utilization,
+            grid_intensity=workload.grid_intensity,
+            embodied_coef=embodied_coef,
+            instance_memory=component.memory_allocated_gb,
+            platform_memory=component.platform_memory_gb,
+            instance_cpu=component.vcpus,
+            platform_cpu=component.platform_vcpus,
+        )
+    return workload
+
+
+def _format_number(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def format_sci_context(workload):
+    """Render a scored workload as a markdown table for the agents."""
+    lines = [
+        "Precomputed SCI inputs, parsed deterministically from the request and scored with the SCI formulas "
+        "(E in kWh, I in gCO2eq/kWh, SCI = (E * I) + M in gCO2eq per hour). "
+        "The parsed inputs and E follow directly from the request; explain them rather than deriving them again. "
+        "Only derive what is marked as missing.",
+        "",
+        f"Country: {workload.country or 'unknown'}, grid intensity I: {_format_number(workload.grid_intensity, 'g')}"
+        + (f" ({workload.grid_intensity_source})" if workload.grid_intensity_source else ""),
+        "",
+        "| Component | SKU | Memory (GB) | Memory util. (%) | vCPUs | CPU util. (%) | Platform (vCPUs / GB) | E | E * I | SCI | Notes |",
+        "|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    if workload.grid_intensity_source and workload.grid_intensity_source.startswith("default"):
+        lines[4:4] = [
+            "I is a default, not a value from the request. If your grid intensity data for this country "
+            "differs, use yours and recompute E * I and SCI from the E column.",
+            "",
+        ]
+    for c in workload.components:
+        platform = "-" if c.platform_vcpus is None else f"{c.platform_vcpus:g} / {c.platform_memory_gb:g}"
+        lines.append(
+            f"| {c.name} | {c.sku or '-'} | {c.memory_allocated_gb:g} | {c.memory_utilization:.1f} | {c.vcpus:g} "
+            f"| {c.cpu_utilization:g} | {platform} | {_format_number(c.energy_kwh, '.4f')} "
+            f"| {_format_number(c.operational, '.2f')} | {_format_number(c.sci, '.2f')} | {'; '.join(c.notes)} |"
+        )
+    return "\n".join(lines)
+
+
+def precompute_sci_context(text):
+    """Parse and score the workload in text; return the context for the agents, or None."""
+    workload = parse_workload(text)
+    if workload is None:
+        return None
+    return format_sci_context(score_workload(workload))
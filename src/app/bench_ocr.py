@@ -0,0 +1,66 @@
+"""Offline benchmark for batch image extraction.
+
+Runs a batch of images through ExtractionWorker with the simulated OCR backend, once with
+a single worker and once with bounded concurrency, and reports the wall time of each.
+When Pillow is installed it also reports how much prepare_image shrinks a phone-sized photo.
+
+Run with: python bench_ocr.py
+"""
+import argparse
+import os
+import time
+from io import BytesIO
+
+from extraction import ExtractionCache, ExtractionWorker, SimulatedOcr, prepare_image
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def run_batch(images, latency, max_workers):
+    ocr = SimulatedOcr(latency=latency)
+    worker = ExtractionWorker(ExtractionCache(), ocr, max_workers=max_workers)
+    start = time.perf_counter()
+    jobs = [worker.submit(data, "image/jpeg") for data in images]
+    for job in jobs:
+        job.wait()
+    return time.perf_counter() - start, ocr
+
+
+def make_photo(width=4032, height=3024):
+    # Noise compresses poorly, which makes it a pessimistic stand-in for a camera photo
+    image = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=95)
+    return output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=16, help="Number of images in the batch.")
+    parser.add_argument("--latency", type=float, default=0.25, help="Simulated OCR round trip in seconds.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Workers used for the concurrent run.")
+    args = parser.parse_args()
+
+    # Distinct payloads so the content-hash cache does not collapse the batch
+    images = [f"image {i}".encode() for i in range(args.images)]
+    sequential, _ = run_batch(images, args.latency, 1)
+    concurrent, ocr = run_batch(images, args.latency, args.concurrency)
+    print(f"{args.images} images, {args.latency * 1000:.0f} ms simulated OCR latency")
+    print(f"  1 worker:  {sequential:.2f} s")
+    print(f"  {args.concurrency} workers: {concurrent:.2f} s ({sequential / concurrent:.1f}x faster, {ocr.calls} OCR calls)")
+
+    if Image is None:
+        print("Pillow is not installed; skipping image downscaling.")
+        return
+    photo = make_photo()
+    start = time.perf_counter()
+    prepared = prepare_image(photo)
+    elapsed = time.perf_counter() - start
+    print(f"Downscaled photo: {len(photo) / 1e6:.1f} MB -> {len(prepared) / 1e6:.1f} MB in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
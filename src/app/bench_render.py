@@ -0,0 +1,95 @@
+"""Benchmark for rendering a streamed response.
+
+Feeds a synthetic SCI answer to the renderer chunk by chunk and reports the average
+cost of one render per quarter of the stream, for the incremental renderer and for
+reprocessing the full response on every chunk (the previous behaviour).
+
+The stream is run in three scenarios: balanced math only; preceded by a line with an
+unmatched $ (a currency amount); and as one long line without line breaks. Neither of
+the last two may keep the renderer from committing.
+
+Run with: python bench_render.py
+Exits with a non-zero status if the incremental cost per chunk grows with the response.
+"""
+import argparse
+import sys
+import time
+
+from latex_render import IncrementalLatexRenderer, process_latex
+
+SAMPLE_PARAGRAPH = (
+    "**Energy Agent**: For the Neo4j API the memory utilization is 70% so E_memory = 0.38*0.858 kWh.\n"
+    "The CPU utilization is 25%, which gives $E_{cpu} = 270 \\times 0.4275$ kWh.\n"
+    "$$SCI = (E \\times I) + M$$\n"
+    "\\begin{equation}\nM = \\frac{TE}{26280} \\times \\frac{RR}{TR}\n\\end{equation}\n"
+    "Use \\text{gCO2eq} per hour as the functional unit.\n\n"
+)
+SCENARIOS = {
+    "balanced": ("", SAMPLE_PARAGRAPH),
+    "unmatched $": ("The VM costs $0.40 per hour.\n", SAMPLE_PARAGRAPH),
+    "single line": ("", SAMPLE_PARAGRAPH.replace("\n", " ")),
+}
+CHUNK_SIZE = 12
+BUCKETS = 4
+
+
+def make_chunks(paragraphs, prefix="", paragraph=SAMPLE_PARAGRAPH):
+    text = prefix + paragraph * paragraphs
+    return [text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+
+
+def time_full(chunks):
+    timings = []
+    full_response = ""
+    for chunk in chunks:
+        full_response += chunk
+        start = time.perf_counter()
+        process_latex(full_response)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_incremental(chunks):
+    timings = []
+    renderer = IncrementalLatexRenderer()
+    for chunk in chunks:
+        start = time.perf_counter()
+        renderer.feed(chunk)
+        renderer.render()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bucket_means(timings):
+    size = len(timings) // BUCKETS
+    return [sum(timings[i * size:(i + 1) * size]) / size for i in range(BUCKETS)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=50, help="Number of sample paragraphs to stream.")
+    parser.add_argument("--max-growth", type=float, default=2.0,
+                        help="Allowed ratio between the last and first quarter of the incremental cost.")
+    args = parser.parse_args()
+
+    failed = False
+    for name, (prefix, paragraph) in SCENARIOS.items():
+        chunks = make_chunks(args.paragraphs, prefix, paragraph)
+        full = bucket_means(time_full(chunks))
+        incremental = bucket_means(time_incremental(chunks))
+
+        print(f"{name}: {len(chunks)} chunks of {CHUNK_SIZE} characters")
+        print(f"{'quarter':>8} {'full (us/chunk)':>16} {'incremental (us/chunk)':>23}")
+        for i, (f, inc) in enumerate(zip(full, incremental), start=1):
+            print(f"{i:>8} {f * 1e6:>16.1f} {inc * 1e6:>23.1f}")
+
+        growth = incremental[-1] / incremental[0]
+        print(f"Incremental growth (last / first quarter): {growth:.2f}x")
+        if growth > args.max_growth:
+            print(f"FAIL: incremental render cost grew more than {args.max_growth}x")
+            failed = True
+        print()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,11 @@
 import streamlit as st
 from dotenv import load_dotenv
 import uuid
-import requests
-import time
-import re
+import logging
 import streamlit.components.v1 as components
 import os
-from azure.core.credentials import AzureKeyCredential
-from azure.ai.vision.imageanalysis import ImageAnalysisClient
-import PyPDF2
+from extraction import PDF_TYPE, IMAGE_TYPES, ExtractionCache, ExtractionWorker, create_ocr_backend
+from latex_render import FrameThrottle, IncrementalLatexRenderer, process_latex
 
 # Load environment variables
 load_dotenv(override=True)
@@ -17,6 +14,12 @@ load_dotenv(override=True)
 AGENT_ENDPOINT = 'http://127.0.0.1:8005'
 AZURE_COMPUTER_VISION_ENDPOINT = os.getenv("AZURE_COMPUTER_VISION_ENDPOINT")
 AZURE_COMPUTER_VISION_KEY = os.getenv("AZURE_COMPUTER_VISION_KEY")
+# Optional directory for the on-disk tier of the extraction cache
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR")
+# OCR backend for images: "azure" or "simulated" for offline use
+OCR_BACKEND = os.getenv("OCR_BACKEND", "azure")
+# Maximum number of files extracted at the same time
+EXTRACTION_CONCURRENCY = int(os.getenv("EXTRACTION_CONCURRENCY", "4"))
 
 # Initialize session state
 if "messages" not in st.session_state:
@@ -25,6 +28,20 @@ if "messages" not in st.session_state:
 if "conversation_id" not in st.session_state:
     st.session_state.conversation_id = str(uuid.uuid4())
 
+# Content hashes of uploads already sent to the agent, so reruns do not post them again
+if "sent_uploads" not in st.session_state:
+    st.session_state.sent_uploads = set()
+
+# Extraction worker shared by all sessions; it survives reruns so uploads are extracted once
+@st.cache_resource
+def get_extraction_worker():
+    cache = ExtractionCache(disk_dir=EXTRACTION_CACHE_DIR)
+    if OCR_BACKEND == "azure":
+        ocr = create_ocr_backend(OCR_BACKEND, endpoint=AZURE_COMPUTER_VISION_ENDPOINT, key=AZURE_COMPUTER_VISION_KEY)
+    else:
+        ocr = create_ocr_backend(OCR_BACKEND)
+    return ExtractionWorker(cache, ocr, max_workers=EXTRACTION_CONCURRENCY)
+
 ################################################################################
 #                                   MAIN
 ################################################################################
@@ -75,62 +92,6 @@ def init_mathjax():
         height=0,
     )
 
-# Helper function to process LaTeX equations
-def process_latex(text):
-    if not text:
-        return text
-        
-    # First, protect existing properly formatted LaTeX
-    protected_blocks = {}
-    protected_count = 0
-    
-    # Protect existing display math blocks
-    for match in re.finditer(r'\$\$(.*?)\$\$', text, re.DOTALL):
-        placeholder = f"__PROTECTED_DISPLAY_MATH_{protected_count}__"
-        protected_blocks[placeholder] = match.group(0)
-        text = text.replace(match.group(0), placeholder)
-        protected_count += 1
-    
-    # Protect existing inline math blocks
-    for match in re.finditer(r'(?<!\$)\$(?!\$)(.*?)(?<!\$)\$(?!\$)', text, re.DOTALL):
-        placeholder = f"__PROTECTED_INLINE_MATH_{protected_count}__"
-        protected_blocks[placeholder] = match.group(0)
-        text = text.replace(match.group(0), placeholder)
-        protected_count += 1
-    
-    # Process equations with LaTeX syntax but not enclosed in LaTeX delimiters
-    patterns = [
-        # Detect common equation patterns without delimiters
-        (r'(?<![\\$])([a-zA-Z0-9_]+\s*=\s*[a-zA-Z0-9_\^\/\*\+\-\(\)\.]+)', r'$\1$'),
-        # Detect LaTeX commands without delimiters
-        (r'(?<![\\$])(\\[a-zA-Z]+\{.*?\})', r'$\1$'),
-        # More specific LaTeX command patterns
-        (r'(?<![\\$])(\\sum|\\prod|\\int|\\frac)(\{.*?\}\{.*?\})', r'$\1\2$'),
-        # Pattern for expressions like \text{...}
-        (r'(?<![\\$])(\\text\{.*?\})', r'$\1$')
-    ]
-    
-    for pattern, replacement in patterns:
-        text = re.sub(pattern, replacement, text)
-    
-    # Ensure proper spacing for LaTeX delimiters
-    text = re.sub(r'(?<!\$)\$(?!\$)', ' $ ', text)
-    text = re.sub(r'\$\$', ' $$ ', text)
-    
-    # Replace common LaTeX environments
-    text = text.replace('\\begin{equation}', '$$')
-    text = text.replace('\\end{equation}', '$$')
-    
-    # Clean up potential issues
-    text = re.sub(r'\$\s*\$', '$', text)  # Empty math delimiters
-    text = re.sub(r'\$\$\s*\$\$', '$$', text)  # Empty display math delimiters
-    
-    # Restore protected blocks
-    for placeholder, original in protected_blocks.items():
-        text = text.replace(placeholder, original)
-    
-    return text
-
 # Function to force MathJax typesetting
 def force_mathjax_typeset():
     return components.html(
@@ -144,44 +105,49 @@ def force_mathjax_typeset():
             }
         } else {
             console.warn('MathJax not loaded yet');
+        }
         </script>
         """,
         height=0,
     )
 
-# Function to extract text from images using Azure AI Vision Image Analysis
-# Reference: https://learn.microsoft.com/en-us/azure/ai-services/computer-vision/quickstarts-sdk/image-analysis-client-library?tabs=python
-
-def extract_text_from_image(image_file):
-    try:
-        client = ImageAnalysisClient(
-            endpoint=AZURE_COMPUTER_VISION_ENDPOINT,
-            credential=AzureKeyCredential(AZURE_COMPUTER_VISION_KEY)
-        )
-        image_bytes = image_file.read()
-        result = client.analyze(
-            image_data=image_bytes,
-            visual_features=["read"]
-        )
-        if result.read and result.read.blocks:
-            text = " ".join([line.text for block in result.read.blocks for line in block.lines])
-            return text
-        else:
-            return None
-    except Exception as e:
-        st.error(f"Error extracting text from image: {str(e)}")
-        return None
-
-# Function to extract text from PDF using PyPDF2
-def extract_text_from_pdf(pdf_file):
-    try:
-        pdf_file.seek(0)
-        reader = PyPDF2.PdfReader(pdf_file)
-        text = "\n".join(page.extract_text() or "" for page in reader.pages)
-        return text.strip() if text else None
-    except Exception as e:
-        st.error(f"Error extracting text from PDF: {str(e)}")
-        return None
+# Function to stream the agent response into a placeholder.
+# LaTeX is processed incrementally and the placeholder is redrawn at most once per frame,
+# so long responses do not slow down as they grow. MathJax typesets once at the end.
+def stream_agent_response(user_input, message_placeholder):
+    import requests
+
+    renderer = IncrementalLatexRenderer()
+    throttle = FrameThrottle()
+    full_response = ""
+
+    # Stream the response
+    with requests.post(
+        f"{AGENT_ENDPOINT}/chat",
+        json={"messages": [{"role": "user", "content": user_input}]},
+        timeout=300,  # Increased timeout for long responses
+        stream=True
+    ) as response:
+        response.raise_for_status()
+
+        # Use an iterator for the response content
+        chunk_count = 0
+        for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+            if chunk:
+                chunk_count += 1
+                full_response += chunk
+                renderer.feed(chunk)
+                if throttle.ready():
+                    message_placeholder.markdown(renderer.render() + "▌", unsafe_allow_html=True)
+        logging.debug(f"Received {chunk_count} chunks, final response length: {len(full_response)}")
+
+        # Final update without the cursor
+        message_placeholder.markdown(renderer.render(), unsafe_allow_html=True)
+
+        # Final typesetting to ensure all math is rendered
+        force_mathjax_typeset()
+
+    return full_response
 
 # Call MathJax initialization
 init_mathjax()
@@ -195,28 +161,54 @@ for message in st.session_state.messages:
 force_mathjax_typeset()
 
 # File upload section
-uploaded_file = st.file_uploader("Upload a PDF or Image", type=["pdf", "png", "jpg", "jpeg"])
+uploaded_files = st.file_uploader("Upload PDFs or Images", type=["pdf", "png", "jpg", "jpeg"], accept_multiple_files=True)
 
 user_input = None  # Ensure user_input is always defined
 
-if uploaded_file:
-    file_type = uploaded_file.type
-    if file_type == "application/pdf":
-        extracted_text = extract_text_from_pdf(uploaded_file)
-        if extracted_text:
-            st.write("Extracted Text from PDF:", extracted_text[:1000] + ("..." if len(extracted_text) > 1000 else ""))
-            user_input = f"Analyze this extracted text from PDF: {extracted_text}"
+if uploaded_files:
+    worker = get_extraction_worker()
+    jobs = []
+    for uploaded_file in uploaded_files:
+        if uploaded_file.type in [PDF_TYPE] + IMAGE_TYPES:
+            jobs.append((uploaded_file, worker.submit(uploaded_file.getvalue(), uploaded_file.type)))
         else:
-            st.error("No text could be extracted from the PDF.")
-    elif file_type in ["image/png", "image/jpeg"]:
-        extracted_text = extract_text_from_image(uploaded_file)
-        if extracted_text:
-            st.write("Extracted Text from Image:", extracted_text)
-            user_input = f"Analyze this extracted text from image: {extracted_text}"
+            st.error(f"Unsupported file type for {uploaded_file.name}. Please upload a PDF or an image.")
+
+    # Poll the background jobs; a rerun interrupts this loop but not the extraction
+    if not all(job.done() for _, job in jobs):
+        progress_bar = st.progress(0.0, text="Extracting text...")
+        while not all(job.wait(timeout=0.2) for _, job in jobs):
+            finished = sum(job.done() for _, job in jobs)
+            progress = sum(job.progress for _, job in jobs) / len(jobs)
+            progress_bar.progress(progress, text=f"Extracting text... ({finished}/{len(jobs)} files)")
+        progress_bar.empty()
+
+    extracted = []
+    for uploaded_file, job in jobs:
+        source, label = ("PDF", "PDF") if job.file_type == PDF_TYPE else ("image", "Image")
+        if job.error:
+            st.error(f"Error extracting text from {source} {uploaded_file.name}: {job.error}")
+            if st.button(f"Retry {uploaded_file.name}", key=f"retry_{job.key}"):
+                worker.retry(job.key)
+                st.rerun()
+        elif job.text:
+            preview = job.text[:1000] + ("..." if len(job.text) > 1000 else "")
+            st.write(f"Extracted Text from {label} {uploaded_file.name}:", preview)
+            if job.key not in st.session_state.sent_uploads:
+                extracted.append((uploaded_file, job, source))
         else:
-            st.error("No text could be extracted from the image.")
-    else:
-        st.error("Unsupported file type. Please upload a PDF or an image.")
+            st.error(f"No text could be extracted from the {source} {uploaded_file.name}.")
+
+    if extracted:
+        st.session_state.sent_uploads.update(job.key for _, job, _ in extracted)
+        if len(extracted) == 1:
+            _, job, source = extracted[0]
+            user_input = f"Analyze this extracted text from {source}: {job.text}"
+        else:
+            sections = "\n\n".join(
+                f"--- {uploaded_file.name} ({source}) ---\n{job.text}" for uploaded_file, job, source in extracted
+            )
+            user_input = f"Analyze this extracted text from {len(extracted)} files:\n\n{sections}"
 
     if user_input:
         st.session_state.messages.append({"role": "user", "content": user_input})
@@ -231,32 +223,7 @@ if uploaded_file:
                 # Show a status while processing
                 message_placeholder.markdown("Processing your request...", unsafe_allow_html=True)
 
-                # Stream the response
-                with requests.post(
-                    f"{AGENT_ENDPOINT}/chat",
-                    json={"messages": [{"role": "user", "content": user_input}]},
-                    stream=True
-                ) as response:
-                    response.raise_for_status()
-
-                    # Use an iterator for the response content
-                    for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
-                        if chunk:
-                            full_response += chunk
-                            # Format with MathJax support
-                            formatted_response = process_latex(full_response)
-                            message_placeholder.markdown(formatted_response + "▌", unsafe_allow_html=True)
-
-                            # Force MathJax typesetting each time content is updated
-                            force_mathjax_typeset()
-                            time.sleep(0.01)  # Small delay for smoother appearance
-
-                    # Final update without the cursor
-                    formatted_response = process_latex(full_response)
-                    message_placeholder.markdown(formatted_response, unsafe_allow_html=True)
-
-                    # Final typesetting to ensure all math is rendered
-                    force_mathjax_typeset()
+                full_response = stream_agent_response(user_input, message_placeholder)
 
             except Exception as e:
                 st.error(f"Error communicating with the agent: {str(e)}")
@@ -312,37 +279,8 @@ if user_input:
             # Show a status while processing
             message_placeholder.markdown("Processing your request...", unsafe_allow_html=True)
             
-            # Stream the response
-            with requests.post(
-                f"{AGENT_ENDPOINT}/chat",
-                json={"messages": [{"role": "user", "content": user_input}]},
-                timeout=300,  # Increased timeout for long responses
-                stream=True
-            ) as response:
-                response.raise_for_status()
-                
-                # Use an iterator for the response content
-                chunk_count = 0
-                for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
-                    if chunk:
-                        chunk_count += 1
-                        print(f"[DEBUG] Received chunk {chunk_count}: '{chunk[:40]}' (length: {len(chunk)})")
-                        full_response += chunk
-                        # Format with MathJax support
-                        formatted_response = process_latex(full_response)
-                        message_placeholder.markdown(formatted_response + "▌", unsafe_allow_html=True)
-                        
-                        # Force MathJax typesetting each time content is updated
-                        force_mathjax_typeset()
-                        time.sleep(0.01)  # Small delay for smoother appearance
-                print(f"[DEBUG] Final response length: {len(full_response)}")
-                # Final update without the cursor
-                formatted_response = process_latex(full_response)
-                message_placeholder.markdown(formatted_response, unsafe_allow_html=True)
-                
-                # Final typesetting to ensure all math is rendered
-                force_mathjax_typeset()
-        
+            full_response = stream_agent_response(user_input, message_placeholder)
+
         except Exception as e:
             st.error(f"Error communicating with the agent: {str(e)}")
             full_response = f"Error: {str(e)}"
@@ -355,6 +293,7 @@ if user_input:
 if st.button("Reset Chat"):
     st.session_state.messages = []
     st.session_state.conversation_id = str(uuid.uuid4())
+    st.session_state.sent_uploads = set()
     st.rerun()
 
 
@@ -0,0 +1,341 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+# Azure AI Vision, PyPDF2 and Pillow are imported where they are used, so loading the
+# UI does not pay for them until a file is uploaded.
+
+PDF_TYPE = "application/pdf"
+IMAGE_TYPES = ["image/png", "image/jpeg"]
+
+# Longest image edge sent to OCR. Phone photos are far larger than Read needs; at this
+# size text that is legible in the original stays well above the minimum character height.
+MAX_OCR_DIMENSION = 2560
+JPEG_QUALITY = 90
+
+
+def content_hash(data):
+    """Return the SHA-256 hex digest used as the cache key for an uploaded file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractionCache:
+    """Cache of extracted text keyed by file content hash.
+
+    Entries live in an in-memory LRU. When a directory is given, entries are also written
+    to disk so they survive restarts; the oldest files are removed once the disk tier holds
+    more than max_disk_entries. The disk tier is best-effort: a file that cannot be read
+    is a miss, and a failed write leaves the entry in memory only.
+    """
+
+    def __init__(self, max_memory_entries=32, disk_dir=None, max_disk_entries=256):
+        self.max_memory_entries = max_memory_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def get(self, key):
+        """Return the cached text for key, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            # Touch the file so disk eviction follows last use
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        """Store the extracted text for key in memory and, if configured, on disk."""
+        self._remember(key, text)
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = [
+            entry for entry in os.scandir(self.disk_dir)
+            if entry.is_file() and entry.name.endswith(".txt")
+        ]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=self._mtime)
+        for entry in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _mtime(entry):
+        # Files removed by another thread sort first and are skipped
+        try:
+            return entry.stat().st_mtime
+        except OSError:
+            return 0
+
+
+class ExtractionJob:
+    """State of one background extraction, shared between the worker and the UI."""
+
+    def __init__(self, key, file_type):
+        self.key = key
+        self.file_type = file_type
+        self.completed = 0
+        self.total = 0
+        self.text = None
+        self.error = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def progress(self):
+        """Fraction of the work completed, between 0.0 and 1.0."""
+        if self._done.is_set():
+            return 1.0
+        if not self.total:
+            return 0.0
+        return min(self.completed / self.total, 1.0)
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _report(self, completed, total):
+        self.completed = completed
+        self.total = total
+
+    def _finish(self, text=None, error=None):
+        self.text = text
+        self.error = error
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+
+class ExtractionWorker:
+    """Runs extractions on background threads and de-duplicates them by content hash.
+
+    Submitting a file that is cached returns a finished job straight away; submitting a
+    file that is still being extracted returns the job in flight. A failed job is returned
+    for retry_after seconds, so reruns show the error instead of calling the service again;
+    after that, or once retry() is called, the file is extracted again.
+    Images are downscaled with prepare_image and read by the given OCR backend; max_workers
+    bounds how many files, and therefore OCR requests, are processed at once.
+    """
+
+    def __init__(self, cache, ocr, max_workers=4, retry_after=30):
+        self.cache = cache
+        self.ocr = ocr
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extraction")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, data, file_type):
+        """Start extracting text from the file bytes and return its ExtractionJob."""
+        key = content_hash(data)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                if job.error is None or time.monotonic() - job.finished_at < self.retry_after:
+                    return job
+                del self._jobs[key]
+
+            job = ExtractionJob(key, file_type)
+            cached = self.cache.get(key)
+            if cached is not None:
+                job._finish(text=cached or None)
+                return job
+
+            self._jobs[key] = job
+        self._executor.submit(self._run, job, data)
+        return job
+
+    def retry(self, key):
+        """Forget a failed extraction so the next submit of the file runs it again."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.error is not None:
+                del self._jobs[key]
+
+    def _run(self, job, data):
+        try:
+            if job.file_type == PDF_TYPE:
+                text = extract_text_from_pdf(BytesIO(data), progress=job._report)
+            elif job.file_type in IMAGE_TYPES:
+                job._report(0, 1)
+                text = self.ocr.read_text(prepare_image(data, job.file_type))
+                job._report(1, 1)
+            else:
+                raise ValueError(f"Unsupported file type: {job.file_type}")
+        except Exception as e:
+            job._finish(error=str(e))
+        else:
+            try:
+                # Files without text are cached too, so they are not extracted again
+                self.cache.put(job.key, text or "")
+            finally:
+                job._finish(text=text)
+        finally:
+            with self._lock:
+                # Finished jobs are served from the cache; failed ones stay until they
+                # expire or are retried
+                if job.error is None and self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+
+
+class AzureVisionOcr:
+    """OCR backend using Azure AI Vision Image Analysis.
+
+    One ImageAnalysisClient is created on first use and shared by all worker threads.
+    Reference: https://learn.microsoft.com/en-us/azure/ai-services/computer-vision/quickstarts-sdk/image-analysis-client-library?tabs=python
+    """
+
+    def __init__(self, endpoint, key):
+        self.endpoint = endpoint
+        self.key = key
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                from azure.core.credentials import AzureKeyCredential
+                from azure.ai.vision.imageanalysis import ImageAnalysisClient
+
+                self._client = ImageAnalysisClient(
+                    endpoint=self.endpoint,
+                    credential=AzureKeyCredential(self.key)
+                )
+            return self._client
+
+    def read_text(self, image_bytes):
+        result = self._get_client().analyze(
+            image_data=image_bytes,
+            visual_features=["read"]
+        )
+        if result.read and result.read.blocks:
+            return " ".join([line.text for block in result.read.blocks for line in block.lines])
+        return None
+
+
+class SimulatedOcr:
+    """Offline OCR stand-in for tests and benchmarks.
+
+    Waits for a fixed latency to mimic a service round trip and returns a description of
+    the image it received, so no network access or credentials are needed.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def read_text(self, image_bytes):
+        with self._lock:
+            self.calls += 1
+            self.bytes_received += len(image_bytes)
+        if self.latency:
+            time.sleep(self.latency)
+        return f"Simulated OCR text for a {len(image_bytes)} byte image."
+
+
+OCR_BACKENDS = {
+    "azure": AzureVisionOcr,
+    "simulated": SimulatedOcr,
+}
+
+
+def create_ocr_backend(name, **kwargs):
+    """Create the OCR backend registered under name."""
+    try:
+        backend = OCR_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown OCR backend: {name}. Choose one of {', '.join(OCR_BACKENDS)}.")
+    return backend(**kwargs)
+
+
+# Function to shrink and re-encode an image before it is uploaded for OCR.
+# Returns the original bytes when Pillow is missing, the image is already small enough,
+# or re-encoding would not make it smaller.
+def prepare_image(image_bytes, file_type=None, max_dimension=MAX_OCR_DIMENSION):
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:  # Pillow is optional; images are uploaded as-is without it
+        return image_bytes
+    try:
+        with Image.open(BytesIO(image_bytes)) as image:
+            if max(image.size) <= max_dimension:
+                return image_bytes
+            # Camera photos are often reported as MPO (multi-picture JPEG) rather than JPEG
+            is_jpeg = file_type == "image/jpeg" or image.format in ("JPEG", "MPO")
+            # Phone photos are often stored sideways with an EXIF rotation
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+            output = BytesIO()
+            if is_jpeg:
+                image.convert("RGB").save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            else:
+                # Keep lossless encoding so thin lines and small text in diagrams stay sharp
+                image.save(output, format="PNG", optimize=True)
+    except Exception:
+        return image_bytes
+
+    prepared = output.getvalue()
+    return prepared if len(prepared) < len(image_bytes) else image_bytes
+
+
+# Function to extract text from PDF using PyPDF2, reporting progress page by page
+def extract_text_from_pdf(pdf_file, progress=None):
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(pdf_file)
+    total = len(reader.pages)
+    pages = []
+    for i, page in enumerate(reader.pages, start=1):
+        pages.append(page.extract_text() or "")
+        if progress:
+            progress(i, total)
+    text = "\n".join(pages)
+    return text.strip() if text else None
@@ -0,0 +1,161 @@
+import re
+import time
+
+# Helper function to process LaTeX equations
+def process_latex(text):
+    if not text:
+        return text
+
+    # First, protect existing properly formatted LaTeX
+    protected_blocks = {}
+    protected_count = 0
+
+    # Protect existing display math blocks
+    for match in re.finditer(r'\$\$(.*?)\$\$', text, re.DOTALL):
+        placeholder = f"__PROTECTED_DISPLAY_MATH_{protected_count}__"
+        protected_blocks[placeholder] = match.group(0)
+        text = text.replace(match.group(0), placeholder)
+        protected_count += 1
+
+    # Protect existing inline math blocks
+    for match in re.finditer(r'(?<!\$)\$(?!\$)(.*?)(?<!\$)\$(?!\$)', text, re.DOTALL):
+        placeholder = f"__PROTECTED_INLINE_MATH_{protected_count}__"
+        protected_blocks[placeholder] = match.group(0)
+        text = text.replace(match.group(0), placeholder)
+        protected_count += 1
+
+    # Process equations with LaTeX syntax but not enclosed in LaTeX delimiters
+    patterns = [
+        # Detect common equation patterns without delimiters
+        (r'(?<![\\$])([a-zA-Z0-9_]+\s*=\s*[a-zA-Z0-9_\^\/\*\+\-\(\)\.]+)', r'$\1$'),
+        # Detect LaTeX commands without delimiters
+        (r'(?<![\\$])(\\[a-zA-Z]+\{.*?\})', r'$\1$'),
+        # More specific LaTeX command patterns
+        (r'(?<![\\$])(\\sum|\\prod|\\int|\\frac)(\{.*?\}\{.*?\})', r'$\1\2$'),
+        # Pattern for expressions like \text{...}
+        (r'(?<![\\$])(\\text\{.*?\})', r'$\1$')
+    ]
+
+    for pattern, replacement in patterns:
+        text = re.sub(pattern, replacement, text)
+
+    # Ensure proper spacing for LaTeX delimiters
+    text = re.sub(r'(?<!\$)\$(?!\$)', ' $ ', text)
+    text = re.sub(r'\$\$', ' $$ ', text)
+
+    # Replace common LaTeX environments
+    text = text.replace('\\begin{equation}', '$$')
+    text = text.replace('\\end{equation}', '$$')
+
+    # Clean up potential issues
+    text = re.sub(r'\$\s*\$', '$', text)  # Empty math delimiters
+    text = re.sub(r'\$\$\s*\$\$', '$$', text)  # Empty display math delimiters
+
+    # Restore protected blocks
+    for placeholder, original in protected_blocks.items():
+        text = text.replace(placeholder, original)
+
+    return text
+
+
+# Tokens that decide whether a position in the stream is outside of any math block
+_BOUNDARY_TOKENS = re.compile(r'\\begin\{equation\}|\\end\{equation\}|\$\$|\$|\n|[.,;:!?] ')
+# Characters kept back from scanning so a token split across chunks is never half-read
+_SCAN_HOLDBACK = len('\\begin{equation}') - 1
+# Longest open tail kept back when a math block never closes
+_MAX_PENDING = 2000
+
+
+class IncrementalLatexRenderer:
+    """Applies process_latex to a streamed response without reprocessing what was already rendered.
+
+    Incoming text is cut at line breaks that sit outside of math blocks. Everything before
+    the last such cut is processed once and kept; only the open tail is processed again on
+    each render, so the cost of a render does not grow with the length of the response.
+    An inline $ still open at a paragraph break is treated as plain text (a currency
+    amount, say). A tail longer than _MAX_PENDING, such as one long line, is cut at the
+    last punctuation break outside math, or else at its last line break or space.
+    """
+
+    def __init__(self):
+        self._committed_text = ""
+        self._pending = ""
+        self._scan_pos = 0
+        self._last_newline = -1
+        self._last_break = -1
+        self._in_inline = False
+        self._in_display = False
+        self._in_equation = False
+
+    def feed(self, chunk):
+        """Add a chunk of streamed text and commit every completed segment."""
+        if not chunk:
+            return
+        self._pending += chunk
+
+        limit = len(self._pending) - _SCAN_HOLDBACK
+        cut = 0
+        for match in _BOUNDARY_TOKENS.finditer(self._pending, self._scan_pos):
+            if match.start() >= limit:
+                break
+            token = match.group(0)
+            if token == '$$':
+                if not self._in_inline:
+                    self._in_display = not self._in_display
+            elif token == '$':
+                if not self._in_display:
+                    self._in_inline = not self._in_inline
+            elif token == '\\begin{equation}':
+                self._in_equation = True
+            elif token == '\\end{equation}':
+                self._in_equation = False
+            elif token[-1] == ' ':
+                if not (self._in_inline or self._in_display or self._in_equation):
+                    self._last_break = match.end()
+            else:
+                if match.start() == self._last_newline:
+                    # Inline math does not span paragraphs; the $ was not a delimiter
+                    self._in_inline = False
+                self._last_newline = match.end()
+                if not (self._in_inline or self._in_display or self._in_equation):
+                    cut = match.end()
+            self._scan_pos = match.end()
+        self._scan_pos = max(self._scan_pos, limit)
+
+        if not cut and len(self._pending) > _MAX_PENDING:
+            # A long line, or a block that never closes, would otherwise be reprocessed on
+            # every render
+            if self._last_break > 0:
+                cut = self._last_break
+            else:
+                cut = max(self._last_newline, self._pending.rfind(' ', 0, self._scan_pos) + 1)
+                if cut > 0:
+                    self._in_inline = self._in_display = self._in_equation = False
+
+        if cut > 0:
+            self._committed_text += process_latex(self._pending[:cut])
+            self._pending = self._pending[cut:]
+            self._scan_pos -= cut
+            self._last_newline -= cut
+            self._last_break -= cut
+
+    def render(self):
+        """Return the processed text for everything received so far."""
+        return self._committed_text + process_latex(self._pending)
+
+
+class FrameThrottle:
+    """Limits UI updates to at most one per frame interval."""
+
+    def __init__(self, interval=1 / 15, clock=time.monotonic):
+        self.interval = interval
+        self._clock = clock
+        self._last = None
+
+    def ready(self):
+        """Return True when a frame is due, and start the next frame interval."""
+        now = self._clock()
+        if self._last is not None and now - self._last < self.interval:
+            return False
+        self._last = now
+        return True
@@ -0,0 +1,83 @@
+from io import BytesIO
+
+import pytest
+
+from extraction import MAX_OCR_DIMENSION, ExtractionCache, ExtractionWorker, SimulatedOcr, prepare_image
+
+
+class FlakyOcr(SimulatedOcr):
+    """Fails the first call, then behaves like SimulatedOcr."""
+
+    def read_text(self, image_bytes):
+        if self.calls == 0:
+            self.calls += 1
+            raise ConnectionError("service unavailable")
+        return super().read_text(image_bytes)
+
+
+def test_submit_is_deduplicated_and_cached():
+    ocr = SimulatedOcr()
+    worker = ExtractionWorker(ExtractionCache(), ocr)
+    job = worker.submit(b"image", "image/png")
+    job.wait()
+    again = worker.submit(b"image", "image/png")
+    assert again.done() and again.text == job.text
+    assert ocr.calls == 1
+
+
+def test_failed_job_is_kept_until_retried():
+    ocr = FlakyOcr()
+    worker = ExtractionWorker(ExtractionCache(), ocr)
+    failed = worker.submit(b"image", "image/png")
+    failed.wait()
+    assert failed.error == "service unavailable"
+    assert worker.submit(b"image", "image/png") is failed
+
+    worker.retry(failed.key)
+    job = worker.submit(b"image", "image/png")
+    job.wait()
+    assert job.error is None and job.text
+
+
+def test_failed_job_expires():
+    worker = ExtractionWorker(ExtractionCache(), FlakyOcr(), retry_after=0)
+    failed = worker.submit(b"image", "image/png")
+    failed.wait()
+    job = worker.submit(b"image", "image/png")
+    job.wait()
+    assert job is not failed and job.error is None
+
+
+def test_job_finishes_when_disk_cache_fails(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = ExtractionCache(disk_dir=str(cache_dir))
+    # Replace the cache directory with a file so every disk read and write fails
+    cache_dir.rmdir()
+    cache_dir.write_text("")
+    worker = ExtractionWorker(cache, SimulatedOcr())
+
+    job = worker.submit(b"image", "image/png")
+    assert job.wait(timeout=5)
+    assert job.error is None and job.text
+    assert cache.get(job.key) == job.text
+
+
+def test_unreadable_disk_entry_is_a_miss(tmp_path):
+    cache = ExtractionCache(disk_dir=str(tmp_path))
+    (tmp_path / "key.txt").write_bytes(b"\xff\xfe not utf-8")
+    assert cache.get("key") is None
+
+
+def test_prepare_image_keeps_camera_photos_as_jpeg():
+    Image = pytest.importorskip("PIL.Image")
+    photo = Image.effect_noise((4032, 3024), 64).convert("RGB")
+    output = BytesIO()
+    # Many phones store photos as multi-picture JPEG, which Pillow reports as MPO
+    photo.save(output, format="MPO", quality=95)
+    data = output.getvalue()
+
+    prepared = prepare_image(data, "image/jpeg")
+    with Image.open(BytesIO(prepared)) as image:
+        assert image.format == "JPEG"
+        assert max(image.size) == MAX_OCR_DIMENSION
+    assert len(prepared) < len(data)
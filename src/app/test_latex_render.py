@@ -0,0 +1,55 @@
+import pytest
+
+from latex_render import FrameThrottle, IncrementalLatexRenderer, _MAX_PENDING, process_latex
+
+SAMPLES = [
+    "**SCI Assistant**: The formula is\n$$\nSCI = (E \\times I) + M\n$$\nwhere E is energy.\n",
+    "Memory energy is $E_{mem} = 0.38 \\times 0.858$ kWh and CPU energy is $E_{cpu} = 270 \\times 0.4275$.\n",
+    "Embodied emissions:\n\\begin{equation}\nM = \\frac{TE}{26280}\n\\end{equation}\nin \\text{gCO2eq}.\n",
+    "Step 1\n$$E = 0.38 \\times 0.858$$\nthen $I = 369$ and\n$$\nM = TE \\times \\frac{1}{26280}\n$$\nSo SCI = E*I+M per hour.\n\n",
+]
+
+
+def stream(text, chunk_size):
+    renderer = IncrementalLatexRenderer()
+    for i in range(0, len(text), chunk_size):
+        renderer.feed(text[i:i + chunk_size])
+    return renderer
+
+
+@pytest.mark.parametrize("text", SAMPLES + ["".join(SAMPLES) * 3])
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 16, 64])
+def test_render_matches_full_processing(text, chunk_size):
+    assert stream(text, chunk_size).render() == process_latex(text)
+
+
+def test_multiline_display_math_is_not_split():
+    renderer = stream("$$\nSCI = (E \\times I) + M\n$$\n", 1)
+    assert "$$\nSCI = (E \\times I) + M\n$$" in renderer.render()
+
+
+def test_unmatched_dollar_is_closed_at_paragraph_break():
+    renderer = stream("The VM costs $0.40 per hour.\n\n" + SAMPLES[0] * 20, 5)
+    assert len(renderer._pending) < len(SAMPLES[0])
+
+
+def test_unclosed_block_tail_is_capped():
+    renderer = stream("$$\n" + "x + y\n" * 1000, 5)
+    assert len(renderer._pending) <= _MAX_PENDING + 5
+
+
+def test_long_line_tail_is_capped():
+    text = "A line with $x^2$ math, and $$y$$ that never breaks. " * 500
+    renderer = stream(text, 7)
+    assert len(renderer._pending) <= _MAX_PENDING + 7
+    assert renderer.render() == process_latex(text)
+
+
+def test_frame_throttle_limits_updates():
+    now = [0.0]
+    throttle = FrameThrottle(interval=0.1, clock=lambda: now[0])
+    assert throttle.ready()
+    now[0] = 0.05
+    assert not throttle.ready()
+    now[0] = 0.1
+    assert throttle.ready()
@@ -0,0 +1,97 @@
+"""Import-time benchmark for the API and UI entry points.
+
+Imports each entry point in a fresh interpreter with `python -X importtime`, reports the
+total import time and the slowest modules, and checks that the heavy dependencies which
+are meant to load lazily were not imported at startup.
+
+Run with: python bench_import.py [api|app ...] [--budget-ms NAME=MS]
+Exits with a non-zero status when an entry point fails to import, goes over its budget,
+or imports one of its lazy dependencies eagerly.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name: (directory, module, import budget in ms, modules that must not load at startup)
+ENTRY_POINTS = {
+    "api": ("api", "main", 1000, ["agent_chat", "semantic_kernel", "azure.identity", "azure.ai.projects", "uvicorn"]),
+    "app": ("app", "chat_app", 3000, ["azure.ai.vision", "PyPDF2", "PIL", "requests"]),
+}
+
+SNIPPET = "import sys, {module}; print('\\n'.join(sorted(sys.modules)))"
+
+
+def parse_importtime(stderr):
+    """Return (total_us, [(self_us, module)]) from `-X importtime` output."""
+    total = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append((int(self_us), name.strip()))
+        # Top-level imports are not indented; their cumulative times add up to the total
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+    return total, modules
+
+
+def measure(name, budget_ms, top):
+    directory, module, _, lazy_modules = ENTRY_POINTS[name]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(module=module)],
+        cwd=os.path.join(SRC_DIR, directory),
+        capture_output=True,
+        text=True,
+    )
+    total_us, modules = parse_importtime(result.stderr)
+
+    print(f"{name}: import {module} from src/{directory}")
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        print(f"  FAIL: import failed: {error}")
+        return False
+
+    ok = True
+    print(f"  total: {total_us / 1000:.0f} ms (budget {budget_ms} ms)")
+    for self_us, module_name in sorted(modules, reverse=True)[:top]:
+        print(f"    {self_us / 1000:8.1f} ms  {module_name}")
+    if total_us / 1000 > budget_ms:
+        print("  FAIL: import time is over budget")
+        ok = False
+
+    loaded = set(result.stdout.split())
+    eager = [lazy for lazy in lazy_modules if lazy in loaded]
+    if eager:
+        print(f"  FAIL: imported at startup instead of on first use: {', '.join(eager)}")
+        ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entry_points", nargs="*", metavar="NAME",
+                        help=f"Entry points to measure: {', '.join(ENTRY_POINTS)} (default: all).")
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="NAME=MS",
+                        help="Override the import budget of an entry point.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list.")
+    args = parser.parse_args()
+
+    names = args.entry_points or list(ENTRY_POINTS)
+    budgets = {name: entry[2] for name, entry in ENTRY_POINTS.items()}
+    for override in args.budget_ms:
+        name, _, ms = override.partition("=")
+        budgets[name] = float(ms)
+    unknown = [name for name in names + list(budgets) if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry point: {', '.join(unknown)}")
+
+    results = [measure(name, budgets[name], args.top) for name in names]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())